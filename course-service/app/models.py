@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, validator
+from typing import Any, Optional, List
+from datetime import datetime
 from bson import ObjectId
 
 class PyObjectId(str):
@@ -29,6 +30,9 @@ class Course(BaseModel):
     instructor: str
     max_students: int
     enrolled_students: List[str] = []
+    waitlist: List[str] = []
+    version: int = 0
+    updated_at: Optional[datetime] = None
 
     class Config:
         populate_by_name = True
@@ -48,10 +52,36 @@ class Course(BaseModel):
             data_dict["_id"] = str(data_dict["_id"])  # Use _id instead of id
         return cls(**data_dict)
 
+class PatchOperation(BaseModel):
+    op: str
+    path: str
+    value: Any
+
+    @validator("op")
+    def validate_op(cls, v):
+        if v != "inc":
+            raise ValueError("op must be inc")
+        return v
+
 class CourseUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     credits: Optional[int] = None
     instructor: Optional[str] = None
     max_students: Optional[int] = None
-    enrolled_students: Optional[List[str]] = None
\ No newline at end of file
+    version: Optional[int] = None
+    ops: Optional[List[PatchOperation]] = None
+
+    @validator("ops", each_item=True)
+    def validate_ops(cls, operation):
+        if operation.path not in ("credits", "max_students"):
+            raise ValueError(f"Cannot inc {operation.path}")
+        if isinstance(operation.value, bool) or not isinstance(operation.value, (int, float)):
+            raise ValueError("inc value must be a number")
+        return operation
+
+    @validator("max_students")
+    def validate_max_students(cls, v):
+        if v is not None and v < 0:
+            raise ValueError("max_students cannot be negative")
+        return v
\ No newline at end of file
@@ -0,0 +1,166 @@
+import hmac
+import math
+import re
+import time
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Tuple
+from fastapi.responses import JSONResponse
+from pymongo import ReturnDocument
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+OBJECT_ID_SEGMENT = re.compile(r"(?<=/)[0-9a-f]{24}(?=/|$)")
+
+class RateLimitBackend(ABC):
+    """Token bucket storage. Subclass to share buckets between workers."""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket for key.
+
+        Returns 0 if the request is allowed, otherwise the number of seconds
+        until a token becomes available.
+        """
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Keeps buckets in this process, evicting the least recently used keys."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, last = self.buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        allowed = tokens >= 1
+        self.buckets[key] = (tokens - 1 if allowed else tokens, now)
+        self.buckets.move_to_end(key)
+        if len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return 0 if allowed else (1 - tokens) / rate
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """Shares buckets between workers through a MongoDB collection.
+
+    Each bucket is refilled and drained by a single pipeline update, so
+    concurrent workers never hand out the same token twice.
+    """
+
+    def __init__(self, get_db: Callable[[], Awaitable], collection: str = "rate_limits"):
+        self.get_db = get_db
+        self.collection = collection
+        self.indexed = False
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        db = await self.get_db()
+        if not self.indexed:
+            # Idle buckets are full again after burst / rate seconds, drop them
+            await db[self.collection].create_index("expires_at", expireAfterSeconds=0)
+            self.indexed = True
+        now = time.time()
+        bucket = await db[self.collection].find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": {"$min": [burst, {"$add": [
+                        {"$ifNull": ["$tokens", burst]},
+                        {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, rate]}
+                    ]}]},
+                    "ts": now,
+                    "expires_at": {"$add": ["$$NOW", int(math.ceil(burst / rate * 1000))]}
+                }},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0 if bucket["allowed"] else (1 - bucket["tokens"]) / rate
+
+class AdmissionControlMiddleware:
+    """Per-client rate limiting and per-route-class concurrency limits.
+
+    Requests are grouped into "list", "read" and "write" classes. Each client
+    gets a token bucket per route, and each class has a cap on requests in
+    flight. Requests over either limit are shed with 429 or 503 and a
+    Retry-After header before they reach MongoDB.
+
+    A client is identified by its X-API-Key only when the key is one of
+    api_keys, otherwise by its IP address, so made-up keys cannot be used to
+    get fresh buckets. Requests carrying one of exempt_keys (the services'
+    shared secret) skip rate limiting.
+    """
+
+    def __init__(
+        self,
+        app,
+        backend: RateLimitBackend,
+        limits: Dict[str, Tuple[float, int]],
+        max_inflight: Dict[str, int],
+        list_paths: Iterable[str] = (),
+        exempt_paths: Iterable[str] = (),
+        api_keys: Iterable[str] = (),
+        exempt_keys: Iterable[str] = ()
+    ):
+        self.app = app
+        self.backend = backend
+        self.limits = limits
+        self.max_inflight = max_inflight
+        self.list_paths = set(list_paths)
+        self.exempt_paths = set(exempt_paths)
+        self.api_keys = {key for key in api_keys if key}
+        self.exempt_keys = [key for key in exempt_keys if key]
+        self.inflight = {route_class: 0 for route_class in max_inflight}
+
+    def route_class(self, method: str, path: str) -> str:
+        if method in ("GET", "HEAD"):
+            return "list" if path in self.list_paths else "read"
+        return "write"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        route_class = self.route_class(method, path)
+        api_key = Headers(scope=scope).get("x-api-key", "")
+        exempt = any(hmac.compare_digest(api_key.encode(), key.encode()) for key in self.exempt_keys)
+        client = api_key if api_key in self.api_keys else (scope.get("client") or ("unknown",))[0]
+
+        if not exempt:
+            rate, burst = self.limits[route_class]
+            key = f"{client}:{method}:{OBJECT_ID_SEGMENT.sub('{id}', path)}"
+            try:
+                retry_after = await self.backend.take(key, rate, burst)
+            except Exception as e:
+                # Never turn a rate limiter outage into an API outage
+                logger.error(f"Rate limit backend failed, allowing request: {str(e)}")
+                retry_after = 0
+            if retry_after > 0:
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Too many requests"},
+                    headers={"Retry-After": str(math.ceil(retry_after))}
+                )
+                await response(scope, receive, send)
+                return
+
+        if self.inflight[route_class] >= self.max_inflight[route_class]:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Service is busy, please retry"},
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        self.inflight[route_class] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight[route_class] -= 1
@@ -0,0 +1,47 @@
+import os
+import sys
+from collections import OrderedDict
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# Rate limiting needs the shared service secret; the tests call the app directly
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import main  # noqa: E402
+
+class StudentService:
+    """Stand-in for the student service that knows every student and records calls."""
+
+    def __init__(self):
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, request.url.path))
+        if request.method == "GET":
+            student_id = request.url.path.rsplit("/", 1)[-1]
+            return httpx.Response(200, json={"id": student_id, "courses": [], "version": 0})
+        return httpx.Response(200, json={"status": "success"})
+
+@pytest.fixture
+def student_service(monkeypatch):
+    service = StudentService()
+    monkeypatch.setattr(main, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(service.handle)))
+    monkeypatch.setattr(main, "student_cache", OrderedDict())
+    return service
+
+@pytest.fixture
+def db(monkeypatch):
+    database = AsyncMongoMockClient()["course_db"]
+
+    async def get_mongodb():
+        return database
+
+    monkeypatch.setattr(main, "get_mongodb", get_mongodb)
+    return database
+
+@pytest.fixture
+def client(db, student_service):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://course")
@@ -0,0 +1,112 @@
+import asyncio
+
+from bson import ObjectId
+
+from app import main
+
+COURSE = {
+    "code": "CS101",
+    "name": "Intro",
+    "description": "Basics",
+    "credits": 3,
+    "instructor": "Dr X",
+    "max_students": 1
+}
+
+async def create_course(client, **fields) -> dict:
+    response = await client.post("/courses/", json={**COURSE, **fields})
+    assert response.status_code == 200
+    return response.json()
+
+async def finish_jobs():
+    """Wait for the jobs started for the student service."""
+    while main.cleanup_tasks:
+        await asyncio.gather(*main.cleanup_tasks.values())
+
+def test_full_course_waitlists_student(client):
+    async def scenario():
+        course = await create_course(client)
+        first, second = str(ObjectId()), str(ObjectId())
+
+        response = await client.post(f"/courses/{course['_id']}/enroll/{first}")
+        assert response.status_code == 200
+        assert response.json()["enrolled_students"] == [first]
+
+        response = await client.post(f"/courses/{course['_id']}/enroll/{second}")
+        assert response.status_code == 202
+        assert response.json() == {"status": "waitlisted", "course_id": course["_id"], "position": 1}
+
+        course = (await client.get(f"/courses/{course['_id']}")).json()
+        assert course["enrolled_students"] == [first]
+        assert course["waitlist"] == [second]
+
+    asyncio.run(scenario())
+
+def test_concurrent_enrollments_never_exceed_capacity(client):
+    async def scenario():
+        course = await create_course(client, max_students=2)
+        students = [str(ObjectId()) for _ in range(5)]
+
+        responses = await asyncio.gather(*[
+            client.post(f"/courses/{course['_id']}/enroll/{student_id}") for student_id in students
+        ])
+        assert sorted(response.status_code for response in responses) == [200, 200, 202, 202, 202]
+
+        course = (await client.get(f"/courses/{course['_id']}")).json()
+        assert len(course["enrolled_students"]) == 2
+        assert sorted(course["enrolled_students"] + course["waitlist"]) == sorted(students)
+
+    asyncio.run(scenario())
+
+def test_unenroll_promotes_from_waitlist(client, student_service):
+    async def scenario():
+        course = await create_course(client)
+        first, second = str(ObjectId()), str(ObjectId())
+        await client.post(f"/courses/{course['_id']}/enroll/{first}")
+        await client.post(f"/courses/{course['_id']}/enroll/{second}")
+
+        response = await client.delete(f"/courses/{course['_id']}/enroll/{first}")
+        assert response.status_code == 200
+        await finish_jobs()
+
+        course = (await client.get(f"/courses/{course['_id']}")).json()
+        assert course["enrolled_students"] == [second]
+        assert course["waitlist"] == []
+        # Both students' records are updated on the student service
+        assert ("DELETE", f"/students/{first}/courses/{course['_id']}") in student_service.requests
+        assert ("PUT", f"/students/{second}/courses/{course['_id']}") in student_service.requests
+
+    asyncio.run(scenario())
+
+def test_stale_if_match_is_rejected_with_conflict(client):
+    async def scenario():
+        course = await create_course(client)
+        etag = (await client.get(f"/courses/{course['_id']}")).headers["ETag"]
+
+        response = await client.put(f"/courses/{course['_id']}", json={"name": "Renamed"}, headers={"If-Match": etag})
+        assert response.status_code == 200
+
+        response = await client.put(f"/courses/{course['_id']}", json={"name": "Lost update"}, headers={"If-Match": etag})
+        assert response.status_code == 409
+        assert response.json()["version"] == 2
+
+        course = (await client.get(f"/courses/{course['_id']}")).json()
+        assert course["name"] == "Renamed"
+
+    asyncio.run(scenario())
+
+def test_negative_max_students_inc_is_rejected(client):
+    async def scenario():
+        course = await create_course(client)
+
+        response = await client.put(
+            f"/courses/{course['_id']}",
+            json={"ops": [{"op": "inc", "path": "max_students", "value": -10}]}
+        )
+        assert response.status_code == 400
+
+        course = (await client.get(f"/courses/{course['_id']}")).json()
+        assert course["max_students"] == 1
+        assert course["version"] == 1
+
+    asyncio.run(scenario())
@@ -43,7 +43,14 @@ function CourseEnrollment({ studentId, onEnrollmentComplete }) {
         }
       );
 
-      if (response.data) {
+      if (response.status === 202) {
+        // Course is full (waitlisted) or the enrollment was queued for processing
+        setSuccess(
+          response.data?.status === 'waitlisted'
+            ? `Course is full. You are number ${response.data.position} on the waitlist.`
+            : 'Your enrollment request has been received and is being processed.'
+        );
+      } else if (response.data) {
         // Get the course name for the success message
         const enrolledCourse = courses.find(course => course._id === courseId);
         const courseName = enrolledCourse ? enrolledCourse.name : 'course';
@@ -21,20 +21,24 @@ function CourseEnrollments() {
       console.log('Courses response:', response.data);
       setCourses(response.data);
       
-      // Fetch student details for each course
+      // Fetch all students in one list call instead of one call per enrolled
+      // student, which would quickly use up the per-route rate limit
+      const studentsResponse = await axios.get(`${process.env.REACT_APP_STUDENT_SERVICE_URL}/students/`);
+      const studentsById = {};
+      for (const student of studentsResponse.data) {
+        studentsById[student.id] = student;
+      }
+
       const details = {};
       console.log('Processing courses for enrollment details');
       for (const course of response.data) {
         console.log('Processing course:', course);
         if (course.enrolled_students && course.enrolled_students.length > 0) {
           console.log('Found enrolled students:', course.enrolled_students);
-          const studentPromises = course.enrolled_students.map(studentId => {
-            console.log('Fetching student:', studentId);
-            return axios.get(`${process.env.REACT_APP_STUDENT_SERVICE_URL}/students/${studentId}`);
-          });
-          const students = await Promise.all(studentPromises);
-          console.log('Student details:', students.map(res => res.data));
-          details[course._id] = students.map(res => res.data);
+          details[course._id] = course.enrolled_students
+            .map(studentId => studentsById[studentId])
+            .filter(Boolean);
+          console.log('Student details:', details[course._id]);
         } else {
           console.log('No students enrolled in course:', course.code);
           details[course._id] = [];
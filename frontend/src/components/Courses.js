@@ -45,8 +45,7 @@ function Courses() {
       const dataToSubmit = {
         ...formData,
         credits: parseInt(formData.credits),
-        max_students: parseInt(formData.max_students),
-        enrolled_students: []  // Initialize empty array for new courses
+        max_students: parseInt(formData.max_students)
       };
 
       if (isEditing && editingId) {
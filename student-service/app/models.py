@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, validator
+from typing import Any, Dict, Optional, List
+from datetime import datetime
 from bson import ObjectId
 
 class PyObjectId(str):
@@ -13,6 +14,15 @@ class PyObjectId(str):
             raise ValueError("Invalid ObjectId")
         return str(v)
 
+class ScheduleEntry(BaseModel):
+    code: str
+    name: str
+    credits: int
+    instructor: str
+    # Course version the details were read at, so older updates never
+    # overwrite newer ones
+    version: int = 0
+
 class Student(BaseModel):
     id: Optional[PyObjectId] = None
     first_name: str
@@ -21,6 +31,11 @@ class Student(BaseModel):
     age: int
     grade: float
     courses: List[str] = []
+    # Copy of each enrolled course's details, keyed by course ID, so a
+    # schedule can be served without asking the course service
+    schedule: Dict[str, ScheduleEntry] = {}
+    version: int = 0
+    updated_at: Optional[datetime] = None
 
     class Config:
         json_encoders = {ObjectId: str}
@@ -30,10 +45,30 @@ class Student(BaseModel):
     def _id(self) -> str:
         return str(self.id) if self.id else None
 
+class PatchOperation(BaseModel):
+    op: str
+    path: str
+    value: Any
+
+    @validator("op")
+    def validate_op(cls, v):
+        if v != "inc":
+            raise ValueError("op must be inc")
+        return v
+
 class StudentUpdate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     email: Optional[EmailStr] = None
     age: Optional[int] = None
     grade: Optional[float] = None
-    courses: Optional[List[str]] = None
\ No newline at end of file
+    version: Optional[int] = None
+    ops: Optional[List[PatchOperation]] = None
+
+    @validator("ops", each_item=True)
+    def validate_ops(cls, operation):
+        if operation.path not in ("age", "grade"):
+            raise ValueError(f"Cannot inc {operation.path}")
+        if isinstance(operation.value, bool) or not isinstance(operation.value, (int, float)):
+            raise ValueError("inc value must be a number")
+        return operation
\ No newline at end of file
@@ -0,0 +1,138 @@
+import gzip
+import httpx
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is used instead
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, JSON is used instead
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+# Accept header for service-to-service calls: msgpack when we can decode it
+SERVICE_ACCEPT = f"{MSGPACK_MEDIA_TYPE}, application/json;q=0.9" if msgpack else "application/json"
+
+COMPRESSIBLE_TYPES = ("application/json", MSGPACK_MEDIA_TYPE, "text/")
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(jsonable_encoder(content))
+
+def wants_msgpack(request: Request) -> bool:
+    """Check whether the caller asked for msgpack and we can produce it."""
+    return msgpack is not None and MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+
+def render(request: Request, content, headers: dict = None) -> Response:
+    """Render content as msgpack or JSON depending on the Accept header."""
+    if wants_msgpack(request):
+        return MsgPackResponse(content, headers=headers)
+    return JSONResponse(jsonable_encoder(content), headers=headers)
+
+def variant_etag(request: Request, etag: str) -> str:
+    """Give the msgpack encoding of a document its own strong ETag."""
+    if wants_msgpack(request):
+        return f'{etag[:-1]}+msgpack"'
+    return etag
+
+def decode_response(response: httpx.Response):
+    """Decode a msgpack or JSON response body from another service."""
+    if msgpack is not None and response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+        return msgpack.unpackb(response.content)
+    return response.json()
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as negotiated through Accept-Encoding.
+
+    Bodies smaller than minimum_size, already encoded, or not JSON, msgpack or
+    text are passed through untouched. Compressed responses, and 304s to
+    clients that accept compression, carry a weak ETag.
+    """
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encoding: str):
+        accepted = {}
+        for item in accept_encoding.lower().split(","):
+            name, _, params = item.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip()] = quality
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    def weaken_etag(self, headers: MutableHeaders):
+        """Mark the ETag weak, since each content-coding changes the bytes it validates."""
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        body = []
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            payload = b"".join(body)
+            headers = MutableHeaders(raw=start_message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                len(payload) >= self.minimum_size
+                and "content-encoding" not in headers
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                payload = self.compress(encoding, payload)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(payload))
+                self.weaken_etag(headers)
+            elif start_message["status"] == 304:
+                # Match the tag the compressed 200 carried
+                self.weaken_etag(headers)
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": payload})
+
+        await self.app(scope, receive, send_compressed)